@@ -16,10 +16,12 @@ Usage:
 
 import configparser
 import logging
+import mmap
 import os
+import re
 import smtplib
 import sys
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from os.path import join
@@ -27,6 +29,8 @@ from pathlib import Path
 
 import dotenv
 
+ERROR_PATTERN = re.compile(rb"(?m)(?:^|(?<=\r))[^\r\n]*ERROR[^\r\n]*")
+
 cwd = os.path.dirname(os.path.abspath(__file__))
 
 logging.basicConfig(
@@ -54,16 +58,25 @@ log_folder = Path(log_folder)
 logging.info(f"The path in which the log files are saved is {log_folder}.")
 
 # --------- Read the log file ---------------
-yesterday = datetime.now() - timedelta(days=1)
-yesterday = yesterday.strftime("%Y%m%d")
+yesterday = (date.today() - timedelta(days=1)).strftime("%Y%m%d")
 logging.info(f"The observation date was {yesterday}.")
 log_file = log_folder / f"{yesterday}_events.log"
 if not log_file.exists():
     logging.error(f"file {log_file} not found")
     sys.exit()
-with open(log_file) as file:
-    lines = file.read().splitlines()
+if log_file.stat().st_size == 0:
+    matches = []
+else:
+    with (
+        open(log_file, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+    ):
+        matches = ERROR_PATTERN.findall(buffer)
 logging.info("The log file has been read.")
+logging.info(f"There is (are) {len(matches)} line(s) to log.")
+if not matches:
+    logging.info("Exiting the script.")
+    sys.exit(0)
 
 BASE_STRING = f"""
 Hello,
@@ -71,16 +84,7 @@ Hello,
 You are receiving the errors occurred in {yesterday}, found for the SPARC4 channel {channel}.
 
 """
-EMAIL_STRING = BASE_STRING
-i = 0
-for line in lines:
-    if "ERROR" in line:
-        EMAIL_STRING += line + "\n"
-        i += 1
-logging.info(f"There is (are) {i} line(s) to log.")
-if i == 0:
-    logging.info("Exiting the script.")
-    sys.exit()
+EMAIL_STRING = BASE_STRING + b"\n".join(matches).decode("utf-8", "replace") + "\n"
 
 # ------------ Send email --------------------
 dotenv.load_dotenv()
@@ -92,13 +96,10 @@ msg["From"] = USER  # type: ignore
 msg["Subject"] = f"{yesterday}: errors found for the SPARC4 channel {channel}."
 msg.attach(MIMEText(EMAIL_STRING, "plain"))
 try:
-    server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
-    server.login(USER, PASSWORD)  # type: ignore
-    texto = msg.as_string()
-    for receiver in RECEIVERS:
-        msg["To"] = receiver  # type: ignore
-        server.sendmail(USER, receiver, texto)  # type: ignore
-        logging.info(f"The email has been sent to {receiver} succesfully.")
-    server.quit()
+    msg["To"] = ", ".join(RECEIVERS)  # type: ignore
+    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+        server.login(USER, PASSWORD)  # type: ignore
+        server.send_message(msg, from_addr=USER, to_addrs=RECEIVERS)  # type: ignore
+    logging.info(f"The email has been sent to {RECEIVERS} succesfully.")
 except Exception as e:
     logging.info(f"Error when sending the email: {repr(e)}")
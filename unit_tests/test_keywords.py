@@ -14,9 +14,10 @@ import logging
 import re
 import unittest
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from getpass import getuser
-from os import listdir
+from os import listdir, scandir
 from os.path import isdir, join
 from pathlib import Path
 
@@ -49,11 +50,11 @@ class Test_Keywords(unittest.TestCase):
         "CCDSERN",
     ]
     regex_expressions = {
-        "FILENAME": r"\d{8}_s4c[1-4]_\d{6}(_[a-z0-9]+)?\.fits$",
-        "DATE-OBS": r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}$",
-        "DATEFILE": r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}$",
-        "UTTIME": r"\d{2}:\d{2}:\d{2}\.\d{6}$",
-        "UTDATE": r"\d{4}-\d{2}-\d{2}$",
+        "FILENAME": r"\d{8}_s4c[1-4]_\d{6}(_[a-z0-9]+)?\.fits\Z",
+        "DATE-OBS": r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}\Z",
+        "DATEFILE": r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}\Z",
+        "UTTIME": r"\d{2}:\d{2}:\d{2}\.\d{6}\Z",
+        "UTDATE": r"\d{4}-\d{2}-\d{2}\Z",
         "RA": r"[\+-]?\d{2}:\d{2}:\d{2}\.\d+",
         "DEC": r"[\+-]?\d{2}:\d{2}:\d{2}\.\d+",
         "TCSHA": r"[\+-]?\d{2}:\d{2}:\d{2}(\.\d+)?",
@@ -80,7 +81,44 @@ class Test_Keywords(unittest.TestCase):
         cls.images_folder = cls._get_images_folder(cfg)
         cls.files = cls._get_files_in_folder(cls.images_folder)
         cls.hdrs_list = cls._get_headers(cls.images_folder, cls.files)
+        cls.comment_cards = {}
+        for hdr in cls.hdrs_list:
+            if "COMMENT" in hdr:
+                cls.comment_cards[hdr["FILENAME"]] = list(hdr["COMMENT"])
+                del hdr["COMMENT"]
         cls.read_noises, cls.ccd_gains, cls.header_content = cls._read_csvs()
+        cls.csv_keywords = cls.header_content["Keyword"].to_list()
+        cls.csv_comments = cls.header_content["Comment"].to_list()
+        index_columns = ["EM Mode", "Readout Rate", "Preamp"]
+        cls.gain_idx = cls.ccd_gains.set_index(index_columns).to_dict("index")
+        cls.read_noise_idx = cls.read_noises.set_index(index_columns).to_dict("index")
+        cls.regex_expressions = {
+            kw: re.compile(expression)
+            for kw, expression in cls.regex_expressions.items()
+        }
+        cls.header_rows = list(
+            cls.header_content[["Keyword", "Type", "Allowed values"]].itertuples(
+                index=False, name=None
+            )
+        )
+        cls.specific_table = {}
+        for kw, _type, allowed_values in cls.header_rows:
+            if kw not in cls.kws_specific_values:
+                continue
+            allowed_vals = allowed_values.split(",")
+            if _type in ["integer", "float"]:
+                allowed_vals = [cls.var_types[_type](val) for val in allowed_vals]
+            cls.specific_table[kw] = (frozenset(allowed_vals), _type)
+        cls.kws_intervals = {
+            kw: tuple(float(limit) for limit in allowed_values.split(","))
+            for kw, _type, allowed_values in cls.header_rows
+            if _type in ["integer", "float"] and kw not in cls.kws_specific_values
+        }
+        cls.hdf = pd.DataFrame(
+            [[hdr.get(kw) for kw in cls.csv_keywords] for hdr in cls.hdrs_list],
+            columns=cls.csv_keywords,
+            index=[hdr.get("FILENAME") for hdr in cls.hdrs_list],
+        )
 
     def _read_config_file() -> configparser.ConfigParser:
         sparc4_folder = Path(f"C:/Users/{getuser()}/SPARC4/ACS")
@@ -101,14 +139,24 @@ class Test_Keywords(unittest.TestCase):
         return yesterday
 
     def _get_files_in_folder(folder_path) -> list:
-        return [file for file in listdir(folder_path) if file[-4:] == "fits"]
+        with scandir(folder_path) as entries:
+            return [
+                entry.name
+                for entry in entries
+                if entry.is_file(follow_symlinks=False) and entry.name.endswith(".fits")
+            ]
 
     def _get_headers(images_folder, files) -> list:
-        hdrs_list = []
-        for file in files:
-            hdr = fits.getheader(join(images_folder, file))
-            hdrs_list.append(hdr)
-        return hdrs_list
+        def read_header(file):
+            path = join(images_folder, file)
+            try:
+                return fits.getheader(path, memmap=True)
+            except OSError as e:
+                logging.error(f"Test: _get_headers, filename: {file}, {repr(e)}")
+                return fits.getheader(path, memmap=True, ignore_missing_end=True)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return list(executor.map(read_header, files))
 
     def _read_csvs() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         read_noises = pd.read_csv(join("csv", "read_noises.csv"))
@@ -124,6 +172,20 @@ class Test_Keywords(unittest.TestCase):
                 f"Test: {func_name}, filename: {filename}, expected val: {expected}, received val: {received}"
             )
 
+    @staticmethod
+    def compare_numbers_batched(expected, values: pd.Series, func_name) -> None:
+        received = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+        invalid = np.isnan(received)
+        for filename, value in values[invalid].items():
+            logging.error(
+                f"Test: {func_name}, filename: {filename}, invalid value: {value}"
+            )
+        mask = ~invalid & ~np.isclose(received, expected)
+        for filename, value in values[mask].items():
+            logging.error(
+                f"Test: {func_name}, filename: {filename}, expected val: {expected}, received val: {value}"
+            )
+
     @staticmethod
     def compare_lists(expected, received, filename, func_name) -> None:
         expected, received = set(expected), set(received)
@@ -148,8 +210,14 @@ class Test_Keywords(unittest.TestCase):
             )
 
     @staticmethod
-    def kw_in_interval(_min, _max, value, kw, filename, func_name) -> None:
-        if not _min <= value <= _max:
+    def kw_in_interval(_min, _max, values: pd.Series, kw, func_name) -> None:
+        numeric_values = pd.to_numeric(values, errors="coerce")
+        for filename, value in values[numeric_values.isna()].items():
+            logging.error(
+                f"Test: {func_name}, filename: {filename}, keyword: {kw}, invalid value: {value}"
+            )
+        out_of_interval = numeric_values.notna() & ~numeric_values.between(_min, _max)
+        for filename, value in values[out_of_interval].items():
             logging.error(
                 f"Test: {func_name}, filename: {filename}, keyword {kw} is not in the interval [{_min}, {_max}]: {value}"
             )
@@ -158,19 +226,26 @@ class Test_Keywords(unittest.TestCase):
     def val_in_list(value, _list, kw, filename, func_name) -> None:
         if value not in _list:
             logging.error(
-                f"Test: {func_name}, filename: {filename}, keyword {kw} is not in {_list}: {value}"
+                f"Test: {func_name}, filename: {filename}, keyword {kw} is not in {sorted(_list, key=str)}: {value}"
             )
 
     @staticmethod
     def verify_regex(value, expression, kw, filename, func_name) -> None:
-        if not re.match(expression, value):
+        if not expression.match(value):
             logging.error(
                 f"Test: {func_name}, filename: {filename}, an unexpected value was found for the keyword {kw}: {value}"
             )
 
     @staticmethod
-    def verify_str_size(value, str_size, kw, filename, func_name) -> None:
-        if (n := len(value)) > str_size:
+    def verify_str_size(values: pd.Series, str_size, kw, func_name) -> None:
+        sizes = values.map(
+            lambda value: len(value) if isinstance(value, str) else np.nan
+        )
+        for filename, value in values[sizes.isna()].items():
+            logging.error(
+                f"Test: {func_name}, filename: {filename}, keyword: {kw}, invalid value: {value}"
+            )
+        for filename, n in sizes[sizes > str_size].astype(int).items():
             logging.error(
                 f"Test: {func_name}, filename: {filename}, the expected size for the keyword {kw} is {str_size}. However, {n} characters were found."
             )
@@ -178,89 +253,58 @@ class Test_Keywords(unittest.TestCase):
     # -------------------------------------------------------------------------------------
 
     def test_missing_keywords(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
-            if "COMMENT" in hdr.keys():
-                del hdr["COMMENT"]
             hdr_keywords = list(hdr.keys())
-            csv_keywords = list(self.header_content["Keyword"].values)
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_lists(csv_keywords, hdr_keywords, hdr["FILENAME"], func_name)
+            self.compare_lists(
+                self.csv_keywords, hdr_keywords, hdr["FILENAME"], func_name
+            )
 
     def test_kw_comments(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
-            if "COMMENT" in hdr.keys():
-                del hdr["COMMENT"]
             hdr_comment = hdr.comments
-            csv_comment = self.header_content["Comment"]
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_lists(csv_comment, hdr_comment, hdr["FILENAME"], func_name)
+            self.compare_lists(
+                self.csv_comments, hdr_comment, hdr["FILENAME"], func_name
+            )
 
     def test_keywords_types(self) -> None:
         func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
-            for _, row in self.header_content.iterrows():
-                kw = row["Keyword"]
+            filename = hdr["FILENAME"]
+            for kw, type_name, _ in self.header_rows:
                 try:
                     keyword_val = hdr[kw]
-                    type = self.var_types[row["Type"]]
-                    self.verify_type(kw, keyword_val, type, hdr["FILENAME"], func_name)
+                    type = self.var_types[type_name]
+                    self.verify_type(kw, keyword_val, type, filename, func_name)
                 except Exception as e:
                     logging.error(
-                        f"Test: {func_name}, filename: {hdr['FILENAME']}, keyword: {kw}, {repr(e)}"
+                        f"Test: {func_name}, filename: {filename}, keyword: {kw}, {repr(e)}"
                     )
         return
 
     def test_kws_in_interval(self) -> None:
         func_name = inspect.currentframe().f_code.co_name
-        filtered_hdr_content = self.header_content[
-            self.header_content["Type"].isin(["integer", "float"])
-        ]
-        for hdr in self.hdrs_list:
-            for _, row in filtered_hdr_content.iterrows():
-                kw = row["Keyword"]
-                if kw in self.kws_specific_values:
-                    continue
-                try:
-                    value = hdr[kw]
-                    filename = hdr["FILENAME"]
-                    if kw not in self.kws_specific_values:
-                        _min, _max = row["Allowed values"].split(",")
-                        _min = float(_min)
-                        if _max == "inf":
-                            _max = np.inf
-                        else:
-                            _max = float(_max)
-
-                        self.kw_in_interval(_min, _max, value, kw, filename, func_name)
-                except Exception as e:
-                    logging.error(
-                        f"Test: {func_name}, filename: {hdr['FILENAME']}, keyword: {kw}, {repr(e)}"
-                    )
-        return
+        for kw, (_min, _max) in self.kws_intervals.items():
+            self.kw_in_interval(_min, _max, self.hdf[kw], kw, func_name)
 
     def test_kws_specific_vals(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
+            filename = hdr["FILENAME"]
             for kw in self.kws_specific_values:
-                row = self.header_content[self.header_content["Keyword"] == kw]
-                allowed_vals = row["Allowed values"].values[0].split(",")
-                _type = row["Type"].values[0]
-                if _type in ["integer", "float"]:
-                    allowed_vals = [
-                        self.var_types[_type](new_val) for new_val in allowed_vals
-                    ]
-                file_name = hdr["FILENAME"]
-                func_name = inspect.currentframe().f_code.co_name
+                allowed_vals, _ = self.specific_table[kw]
                 value = hdr[kw]
-                self.val_in_list(value, allowed_vals, kw, file_name, func_name)
-                assert hdr[kw] in allowed_vals
+                self.val_in_list(value, allowed_vals, kw, filename, func_name)
+                assert value in allowed_vals
 
     def test_kws_regex(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
+            filename = hdr["FILENAME"]
             for kw in self.regex_expressions:
                 expression = self.regex_expressions[kw]
                 value = hdr[kw]
-                filename = hdr["FILENAME"]
-                func_name = inspect.currentframe().f_code.co_name
                 self.verify_regex(value, expression, kw, filename, func_name)
         return
 
@@ -274,34 +318,24 @@ class Test_Keywords(unittest.TestCase):
         return
 
     def test_comment_kw(self) -> None:
-        for hdr in self.hdrs_list:
-            if "COMMENT" in hdr.keys():
-                filename = hdr["FILENAME"]
-                expected = ""
-                received = hdr["COMMENT"]
-                func_name = inspect.currentframe().f_code.co_name
-                self.verify_if_different(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        for filename, received in self.comment_cards.items():
+            expected = ""
+            self.verify_if_different(expected, received, filename, func_name)
 
     # -------------------- tests to verify the keywords content ----------------------------
 
     def test_observatory_coords(self) -> None:
-        for hdr in self.hdrs_list:
-            filename = hdr["FILENAME"]
-            func_name = inspect.currentframe().f_code.co_name
-
-            received = hdr["OBSLONG"]
-            expected = -45.5825
-            self.compare_numbers(expected, received, filename, func_name)
-
-            received = hdr["OBSLAT"]
-            expected = -22.534
-            self.compare_numbers(expected, received, filename, func_name)
-
-            received = hdr["OBSALT"]
-            expected = 1864.0
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        for kw, expected in [
+            ("OBSLONG", -45.5825),
+            ("OBSLAT", -22.534),
+            ("OBSALT", 1864.0),
+        ]:
+            self.compare_numbers_batched(expected, self.hdf[kw], func_name)
 
     def test_ccd_gain(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
             em_mode = hdr["EMMODE"]
             if em_mode != "Conventional":
@@ -310,21 +344,16 @@ class Test_Keywords(unittest.TestCase):
             preamp = float(hdr["PREAMP"][-1])
             serial_number = f"{hdr['CCDSERN']}"
             gain = hdr["GAIN"]
-            filter = (
-                (self.ccd_gains["EM Mode"] == em_mode)
-                & (self.ccd_gains["Readout Rate"] == readout)
-                & (self.ccd_gains["Preamp"] == preamp)
-            )
-            line = self.ccd_gains[filter]
+            row = self.gain_idx[(em_mode, readout, preamp)]
             filename, expected, received = (
                 hdr["FILENAME"],
-                line[serial_number].values[0],
+                row[serial_number],
                 gain,
             )
-            func_name = inspect.currentframe().f_code.co_name
             self.compare_numbers(expected, received, filename, func_name)
 
     def test_read_noise(self) -> None:
+        func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
             em_mode = hdr["EMMODE"]
             if em_mode != "Conventional":
@@ -333,75 +362,57 @@ class Test_Keywords(unittest.TestCase):
             preamp = float(hdr["PREAMP"][-1])
             serial_number = f"{hdr['CCDSERN']}"
             read_noise = hdr["RDNOISE"]
-            filter = (
-                (self.read_noises["EM Mode"] == em_mode)
-                & (self.read_noises["Readout Rate"] == readout)
-                & (self.read_noises["Preamp"] == preamp)
-            )
-            line = self.read_noises[filter]
+            row = self.read_noise_idx[(em_mode, readout, preamp)]
             filename, expected, received = (
                 hdr["FILENAME"],
-                line[serial_number].values[0],
+                row[serial_number],
                 read_noise,
             )
-            func_name = inspect.currentframe().f_code.co_name
             self.compare_numbers(expected, received, filename, func_name)
 
     def test_equinox(self) -> None:
-        for hdr in self.hdrs_list:
-            filename, expected, received = (hdr["FILENAME"], 2000.0, hdr["EQUINOX"])
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        self.compare_numbers_batched(2000.0, self.hdf["EQUINOX"], func_name)
 
     def test_BSCALE(self) -> None:
-        for hdr in self.hdrs_list:
-            filename, expected, received = (hdr["FILENAME"], 1, hdr["BSCALE"])
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        self.compare_numbers_batched(1, self.hdf["BSCALE"], func_name)
 
     def test_BZERO(self) -> None:
-        for hdr in self.hdrs_list:
-            received = hdr["BZERO"]
-            expected = 2**15
-            filename = hdr["FILENAME"]
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        self.compare_numbers_batched(2**15, self.hdf["BZERO"], func_name)
 
     def test_BITPIX(self) -> None:
-        for hdr in self.hdrs_list:
-            filename, expected, received = (hdr["FILENAME"], 16, hdr["BITPIX"])
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        self.compare_numbers_batched(16, self.hdf["BITPIX"], func_name)
 
     def test_NAXIS(self) -> None:
-        for hdr in self.hdrs_list:
-            filename, expected, received = (hdr["FILENAME"], 2, hdr["NAXIS"])
-            func_name = inspect.currentframe().f_code.co_name
-            self.compare_numbers(expected, received, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        self.compare_numbers_batched(2, self.hdf["NAXIS"], func_name)
 
     def test_kw_sizes(self) -> None:
-        for hdr in self.hdrs_list:
-            for kw, str_size in self.kws_fixed_str_size:
-                kw_value, filename = hdr[kw], hdr["FILENAME"]
-                func_name = inspect.currentframe().f_code.co_name
-                self.verify_str_size(kw_value, str_size, kw, filename, func_name)
+        func_name = inspect.currentframe().f_code.co_name
+        for kw, str_size in self.kws_fixed_str_size:
+            self.verify_str_size(self.hdf[kw], str_size, kw, func_name)
 
     def test_simulated_mode(self) -> None:
         func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
+            filename = hdr["FILENAME"]
             for kw in self.simulated_mode_kws:
                 if not hdr[kw]:
                     logging.error(
-                        f"Test: {func_name}, filename: {hdr['FILENAME']}, the keyword {kw} was set in the simulated mode."
+                        f"Test: {func_name}, filename: {filename}, the keyword {kw} was set in the simulated mode."
                     )
 
     def test_empty_kws(self) -> None:
         func_name = inspect.currentframe().f_code.co_name
         for hdr in self.hdrs_list:
+            filename = hdr["FILENAME"]
             for kw in ["OBSERVER", "PROPID", "OBJECT"]:
                 if hdr[kw] == "":
                     logging.error(
-                        f"Test: {func_name}, filename: {hdr['FILENAME']}, the keyword {kw} is empty."
+                        f"Test: {func_name}, filename: {filename}, the keyword {kw} is empty."
                     )
 
     def test_checksum_datasum(self) -> None: